@@ -2,14 +2,14 @@ import pandas as pd
 import sys
 import warnings
 from .utils_dynamics import *
-from .utils import despline, _matplotlib_points, _datashade_points, _select_font_color
+from .utils import despline, _matplotlib_points, _datashade_points, _select_font_color, _csr_cols_to_dense
 from .utils import arrowed_spines, despline_all, deaxis_all
 from .utils import quiver_autoscaler, default_quiver_args
 from .utils import save_fig
 from .scatters import scatters
 from ..estimation.csc.velocity import sol_u, sol_s, solve_first_order_deg
 from ..estimation.tsc.utils_moments import moments
-from ..tools.utils import get_mapper, log1p_, update_dict, get_valid_bools, index_gene
+from ..tools.utils import get_mapper, log1p_, update_dict, get_valid_bools
 from ..configuration import _themes
 
 
@@ -190,7 +190,7 @@ def phase_portraits(
         else 500.0 / np.sqrt(adata.shape[0]) * 5 * pointsize
     )
     scatter_kwargs = dict(
-        alpha=0.2, s=point_size, edgecolor=None, linewidth=0
+        alpha=0.2, s=point_size, edgecolor=None, linewidth=0, rasterized=True
     )  # (0, 0, 0, 1)
 
     if kwargs is not None:
@@ -200,7 +200,8 @@ def phase_portraits(
 
     if type(genes) == str:
         genes = [genes]
-    _genes = list(set(adata.var.index).intersection(genes))
+    gene_mask = adata.var.index.isin(genes)
+    _genes = adata.var.index[gene_mask].tolist()
 
     # avoid object for dtype in the gamma column https://stackoverflow.com/questions/40809503/python-numpy-typeerror-ufunc-isfinite-not-supported-for-the-input-types
     if adata.uns['dynamics']['experiment_type'] in ['one-shot', 'kin', 'deg', 'mix_kin_deg', 'mix_pulse_chase']:
@@ -209,10 +210,10 @@ def phase_portraits(
         k_name = 'gamma'
 
     valid_id = np.isfinite(
-        np.array(adata.var.loc[_genes, k_name], dtype="float")
-    ).flatten()
-    genes = np.array(_genes)[valid_id].tolist()
-    # idx = [adata.var.index.to_list().index(i) for i in genes]
+        np.array(adata.var.loc[gene_mask, k_name], dtype="float")
+    )
+    gene_idx = np.flatnonzero(gene_mask)[valid_id]
+    genes = adata.var.index[gene_idx].tolist()
 
     if len(genes) == 0:
         raise Exception(
@@ -227,13 +228,8 @@ def phase_portraits(
         from ..tools.dimension_reduction import reduceDimension
         reduceDimension(adata, reduction_method=basis)
 
-    embedding = pd.DataFrame(
-        {
-            basis + "_0": adata.obsm["X_" + basis][:, x],
-            basis + "_1": adata.obsm["X_" + basis][:, y],
-        }
-    )
-    embedding.columns = ["dim_1", "dim_2"]
+    # contiguous float32 coordinates shared by all embedding panels
+    embedding_xy = np.ascontiguousarray(adata.obsm["X_" + basis][:, [x, y]], dtype=np.float32)
 
     if has_labeling and not has_splicing:
         mode = 'labeling'
@@ -257,21 +253,21 @@ def phase_portraits(
     if ekey in layers:
         if ekey == "X":
             E_vec = (
-                index_gene(adata, adata.layers[mapper['X']], genes)
+                _csr_cols_to_dense(adata.layers[mapper['X']], gene_idx)
                 if mapper["X"] in adata.layers.keys()
-                else index_gene(adata, adata.X, genes)
+                else _csr_cols_to_dense(adata.X, gene_idx)
             )
         elif ekey in ["protein", "X_protein"]:
             E_vec = (
-                index_gene(adata, adata.layers[mapper[ekey]], genes)
+                _csr_cols_to_dense(adata.obsm[mapper[ekey]], gene_idx)
                 if (ekey in mapper.keys()) and (mapper[ekey] in adata.obsm_keys())
-                else index_gene(adata, adata.obsm[ekey], genes)
+                else _csr_cols_to_dense(adata.obsm[ekey], gene_idx)
             )
         else:
             E_vec = (
-                index_gene(adata, adata.layers[mapper[ekey]], genes)
+                _csr_cols_to_dense(adata.layers[mapper[ekey]], gene_idx)
                 if (ekey in mapper.keys()) and (mapper[ekey] in adata.layers.keys())
-                else index_gene(adata, adata.layers[ekey], genes)
+                else _csr_cols_to_dense(adata.layers[ekey], gene_idx)
             )
         
         if log1p: E_vec = log1p_(adata, E_vec)
@@ -280,41 +276,38 @@ def phase_portraits(
 
     color_vec = np.repeat(np.nan, n_cells)
     if color is not None:
-        color_vec = adata.obs[color].to_list()
+        color_vec = np.array(adata.obs[color].to_list(), dtype=object)
+    has_color = not pd.isna(color_vec).all()
 
     if "velocity_" not in vkey:
         vkey = "velocity_" + vkey
     if vkey == "velocity_U":
-        V_vec = index_gene(adata, adata.layers['velocity_U'], genes)
+        V_vec = _csr_cols_to_dense(adata.layers['velocity_U'], gene_idx)
         if "velocity_P" in adata.obsm.keys():
-            P_vec = index_gene(adata, adata.layers['velocity_P'], genes)
+            P_vec = _csr_cols_to_dense(adata.layers['velocity_P'], gene_idx)
     elif vkey == "velocity_S":
-        V_vec = index_gene(adata, adata.layers['velocity_S'], genes)
+        V_vec = _csr_cols_to_dense(adata.layers['velocity_S'], gene_idx)
         if "velocity_P" in adata.obsm.keys():
-            P_vec = index_gene(adata, adata.layers['velocity_P'], genes)
+            P_vec = _csr_cols_to_dense(adata.layers['velocity_P'], gene_idx)
     elif vkey == "velocity_T":
-        V_vec = index_gene(adata, adata.layers['velocity_T'], genes)
+        V_vec = _csr_cols_to_dense(adata.layers['velocity_T'], gene_idx)
         if "velocity_P" in adata.obsm.keys():
-            P_vec = index_gene(adata, adata.layers['velocity_P'], genes)
+            P_vec = _csr_cols_to_dense(adata.layers['velocity_P'], gene_idx)
     else:
         raise Exception(
             "adata has no vkey {} in either the layers or the obsm slot".format(vkey)
         )
 
-    E_vec, V_vec = (
-        E_vec.A if issparse(E_vec) else E_vec,
-        V_vec.A if issparse(V_vec) else V_vec,
-    )
-
     if k_name in adata.var.columns:
         if (
                 not ("gamma_b" in adata.var.columns)
                 or all(adata.var.gamma_b.isna())
         ):
             adata.var.loc[:, "gamma_b"] = 0
+        var_g = adata.var.iloc[gene_idx]
         gamma, velocity_offset = (
-            index_gene(adata, adata.var.loc[:, k_name].values, genes),
-            index_gene(adata, adata.var.gamma_b.values, genes)
+            np.array(var_g.loc[:, k_name], dtype=float),
+            np.array(var_g.gamma_b, dtype=float),
         )
         (
             gamma[~np.isfinite(list(gamma))],
@@ -328,96 +321,76 @@ def phase_portraits(
 
     if mode == "labeling":
         new_mat, tot_mat = (
-            index_gene(adata, adata.layers[mapper["X_new"]], genes),
-            index_gene(adata, adata.layers[mapper["X_total"]], genes)
-        )
-
-        new_mat, tot_mat = (
-            (new_mat.A, tot_mat.A) if issparse(new_mat) else (new_mat, tot_mat)
+            _csr_cols_to_dense(adata.layers[mapper["X_new"]], gene_idx),
+            _csr_cols_to_dense(adata.layers[mapper["X_total"]], gene_idx)
         )
 
         vel_u, vel_s = (
-            index_gene(adata, adata.layers["velocity_N"].A, genes),
-            index_gene(adata, adata.layers["velocity_T"].A, genes)
+            _csr_cols_to_dense(adata.layers["velocity_N"], gene_idx),
+            _csr_cols_to_dense(adata.layers["velocity_T"], gene_idx)
         )
 
-        df = pd.DataFrame(
-            {
-                "new": new_mat.flatten(),
-                "total": tot_mat.flatten(),
-                "gene": genes * n_cells,
-                "gamma": np.tile(gamma, n_cells),
-                "velocity_offset": np.tile(velocity_offset, n_cells),
-                "expression": E_vec.flatten(),
-                "velocity": V_vec.flatten(),
-                "color": np.repeat(color_vec, n_genes),
-                "vel_u": vel_u.flatten(),
-                "vel_s": vel_s.flatten(),
-            },
-            index=range(n_cells * n_genes),
-        )
+        data = {
+            "new": new_mat,
+            "total": tot_mat,
+            "expression": E_vec,
+            "velocity": V_vec,
+            "vel_u": vel_u,
+            "vel_s": vel_s,
+        }
 
     elif mode == "splicing":
         unspliced_mat, spliced_mat = (
-            index_gene(adata, adata.layers[mapper["X_unspliced"]], genes),
-            index_gene(adata, adata.layers[mapper["X_spliced"]], genes)
-        )
-                
-        unspliced_mat, spliced_mat = (
-            (unspliced_mat.A, spliced_mat.A)
-            if issparse(unspliced_mat)
-            else (unspliced_mat, spliced_mat)
-        )
-
-        vel_u, vel_s = (
-            np.zeros_like(index_gene(adata, adata.layers["velocity_S"].A, genes)),
-            index_gene(adata, adata.layers["velocity_S"].A, genes)
+            _csr_cols_to_dense(adata.layers[mapper["X_unspliced"]], gene_idx),
+            _csr_cols_to_dense(adata.layers[mapper["X_spliced"]], gene_idx)
         )
 
-        df = pd.DataFrame(
-            {
-                "U": unspliced_mat.flatten(),
-                "S": spliced_mat.flatten(),
-                "gene": genes * n_cells,
-                "gamma": np.tile(gamma, n_cells),
-                "velocity_offset": np.tile(velocity_offset, n_cells),
-                "expression": E_vec.flatten(),
-                "velocity": V_vec.flatten(),
-                "color": np.repeat(color_vec, n_genes),
-                "vel_u": vel_u.flatten(),
-                "vel_s": vel_s.flatten(),
-            },
-            index=range(n_cells * n_genes),
-        )
+        vel_s = _csr_cols_to_dense(adata.layers["velocity_S"], gene_idx)
+        # zero-copy constant view, only the per-gene columns are ever read
+        vel_u = np.broadcast_to(np.float32(0), vel_s.shape)
+
+        data = {
+            "U": unspliced_mat,
+            "S": spliced_mat,
+            "expression": E_vec,
+            "velocity": V_vec,
+            "vel_u": vel_u,
+            "vel_s": vel_s,
+        }
 
     elif mode == "full":
-        U, S, N, T = (
-            index_gene(adata, adata.layers[mapper["X_unspliced"]], genes),
-            index_gene(adata, adata.layers[mapper["X_spliced"]], genes),
-            index_gene(adata, adata.layers[mapper["X_new"]], genes),
-            index_gene(adata, adata.layers[mapper["X_total"]], genes),
-        )
-        U, S, N, T = (
-            (U.A, S.A, N.A, T.A) if issparse(U) else (U, S, N, T)
-        )
+        # only the phase plane picked by vkey is drawn, the protein panels additionally read the spliced layer
+        data = {"expression": E_vec, "velocity": V_vec}
+        if vkey == 'velocity_S' or "protein" in adata.obsm.keys():
+            data["S"] = _csr_cols_to_dense(adata.layers[mapper["X_spliced"]], gene_idx)
+        if vkey == 'velocity_S':
+            data["U"] = _csr_cols_to_dense(adata.layers[mapper["X_unspliced"]], gene_idx)
+        else:
+            data["new"], data["total"] = (
+                _csr_cols_to_dense(adata.layers[mapper["X_new"]], gene_idx),
+                _csr_cols_to_dense(adata.layers[mapper["X_total"]], gene_idx),
+            )
 
         vel_u, vel_s = (
-            index_gene(adata, adata.layers["velocity_U"].A, genes) if "velocity_U" in adata.layers.keys() else None,
-            index_gene(adata, adata.layers["velocity_S"].A, genes),
+            _csr_cols_to_dense(adata.layers["velocity_U"], gene_idx) if "velocity_U" in adata.layers.keys() else None,
+            _csr_cols_to_dense(adata.layers["velocity_S"], gene_idx),
         ) if vkey == 'velocity_S' else (
-            index_gene(adata, adata.layers["velocity_N"].A, genes) if "velocity_U" in adata.layers.keys() else None,
-            index_gene(adata, adata.layers["velocity_T"].A, genes),
+            _csr_cols_to_dense(adata.layers["velocity_N"], gene_idx) if "velocity_U" in adata.layers.keys() else None,
+            _csr_cols_to_dense(adata.layers["velocity_T"], gene_idx),
         )
+        if vel_u is None:
+            vel_u = np.broadcast_to(np.float32(0), vel_s.shape)
+
         if "protein" in adata.obsm.keys():
             if "delta" in adata.var.columns:
-                gamma_P = adata.var.delta[genes].values
+                gamma_P = var_g.delta.values
                 velocity_offset_P = (
-                    [0] * n_cells
+                    np.zeros(n_genes)
                     if (
                             not ("delta_b" in adata.var.columns)
-                            or adata.var.delta_b.unique() is None
+                            or all(adata.var.delta_b.isna())
                     )
-                    else adata.var.delta_b[genes].values
+                    else var_g.delta_b.values
                 )
             else:
                 raise Exception(
@@ -426,68 +399,52 @@ def phase_portraits(
                 )
 
             P = (
-                index_gene(adata, adata.obsm[mapper["X_protein"]], genes)
-                if (
-                        ["X_protein"] in adata.obsm.keys()
-                        or [mapper["X_protein"]] in adata.obsm.keys()
-                )
-                else index_gene(adata, adata.obsm["protein"], genes)
+                _csr_cols_to_dense(adata.obsm[mapper["X_protein"]], gene_idx)
+                if mapper["X_protein"] in adata.obsm.keys()
+                else _csr_cols_to_dense(adata.obsm["protein"], gene_idx)
             )
-            P = P.A if issparse(P) else P
-            if issparse(P_vec):
-                P_vec = P_vec.A
 
-            vel_p = np.zeros_like(adata.obsm["velocity_P"][:, :])
+            vel_p = np.broadcast_to(np.float32(0), P.shape)
 
             # df = pd.DataFrame({"uu": uu.flatten(), "ul": ul.flatten(), "su": su.flatten(), "sl": sl.flatten(), "P": P.flatten(),
             #                    'gene': genes * n_cells, 'prediction': np.tile(gamma, n_cells) * uu.flatten() +
             #                     np.tile(velocity_offset, n_cells), "velocity": genes * n_cells}, index=range(n_cells * n_genes))
-            df = pd.DataFrame(
-                {
-                    "new": N.flatten(),
-                    "total": T.flatten(),
-                    "S": S.flatten(),
-                    "U": U.flatten(),
-                    "P": P.flatten(),
-                    "gene": genes * n_cells,
-                    "gamma": np.tile(gamma, n_cells),
-                    "velocity_offset": np.tile(velocity_offset, n_cells),
-                    "gamma_P": np.tile(gamma_P, n_cells),
-                    "velocity_offset_P": np.tile(velocity_offset_P, n_cells),
-                    "expression": E_vec.flatten(),
-                    "velocity": V_vec.flatten(),
-                    "velocity_protein": P_vec.flatten(),
-                    "color": np.repeat(color_vec, n_genes),
-                    "vel_u": vel_u.flatten() if vel_u is not None else None,
-                    "vel_s": vel_s.flatten(),
-                    "vel_p": vel_p.flatten(),
-                },
-                index=range(n_cells * n_genes),
-            )
-        else:
-            df = pd.DataFrame(
-                {
-                    "new": N.flatten(),
-                    "total": T.flatten(),
-                    "S": S.flatten(),
-                    "U": U.flatten(),
-                    "gene": genes * n_cells,
-                    "gamma": np.tile(gamma, n_cells),
-                    "velocity_offset": np.tile(velocity_offset, n_cells),
-                    "expression": E_vec.flatten(),
-                    "velocity": V_vec.flatten(),
-                    "color": np.repeat(color_vec, n_genes),
-                    "vel_u": vel_u.flatten(),
-                    "vel_s": vel_s.flatten(),
-                },
-                index=range(n_cells * n_genes),
-            )
+            data.update({"P": P, "velocity_protein": P_vec, "vel_p": vel_p})
+
+        data.update({"vel_u": vel_u, "vel_s": vel_s})
     else:
         raise Exception(
             "Your adata is corrupted. Make sure that your layer has keys new, old for the labelling mode, "
             "spliced, ambiguous, unspliced for the splicing model and uu, ul, su, sl for the full mode"
         )
 
+    # float32 is plenty for pixel positions and colors and halves what is handed to matplotlib
+    data = {k: v.astype(np.float32, copy=False) for k, v in data.items()}
+
+    # color limits of the velocity panels of every gene
+    V_vec = data["velocity"]
+    v_max_all = np.where(
+        np.nanmin(V_vec, axis=0) + np.nanmax(V_vec, axis=0) == 0, 0.01, np.nanmax(np.abs(V_vec), axis=0)
+    )
+    if "velocity_protein" in data.keys():
+        P_vec = data["velocity_protein"]
+        # np.percentile partitions all columns at once, np.nanpercentile falls back to a loop over columns
+        percentile = np.nanpercentile if np.isnan(P_vec).any() else np.percentile
+        limit = np.nanmax(
+            np.abs(percentile(P_vec, [1, 99], axis=0)), axis=0
+        )  # upper and lowe limit / saturation of each gene
+        # shift, scale and clip in place
+        P_norm = np.add(P_vec, limit, dtype=np.float32)
+        np.divide(P_norm, 2 * limit, out=P_norm, casting="unsafe")
+        np.clip(P_norm, 0, 1, out=P_norm)
+
+    # phase plane ranges of every gene in one column-wise reduction, reused for the fit lines and axis limits
+    x_key, y_key = ("S", "U") if vkey == 'velocity_S' else ("total", "new")
+    x_min, x_max, y_max = np.min(data[x_key], axis=0), np.max(data[x_key], axis=0), np.max(data[y_key], axis=0)
+    if "velocity_protein" in data.keys():
+        p_min, p_max = np.min(data["P"], axis=0), np.max(data["P"], axis=0)
+        s_min, s_max = np.min(data["S"], axis=0), np.max(data["S"], axis=0)
+
     num_per_gene = 6 if ("protein" in adata.obsm.keys() and mode == "full") else 3
     ncols = min([num_per_gene, ncols]) if ncols is not None else num_per_gene
     nrow, ncol = int(np.ceil(num_per_gene * n_genes / ncols)), ncols
@@ -512,26 +469,30 @@ def phase_portraits(
     else:
         discrete_theme, continous_theme, divergent_theme = discrete_continous_div_themes
 
+    discrete_d, continous_d, divergent_d = (_themes[t] for t in (discrete_theme, continous_theme, divergent_theme))
     discrete_cmap, discrete_color_key_cmap, discrete_background = (
-        _themes[discrete_theme]["cmap"] if discrete_continous_div_cmap is None else discrete_continous_div_cmap[0],
-        _themes[discrete_theme]["color_key_cmap"] if discrete_continous_div_color_key_cmap is None else
+        discrete_d["cmap"] if discrete_continous_div_cmap is None else discrete_continous_div_cmap[0],
+        discrete_d["color_key_cmap"] if discrete_continous_div_color_key_cmap is None else
         discrete_continous_div_color_key_cmap[0],
-        _themes[discrete_theme]["background"],
+        discrete_d["background"],
     )
     continous_cmap, continous_color_key_cmap, continous_background = (
-        _themes[continous_theme]["cmap"] if discrete_continous_div_cmap is None else discrete_continous_div_cmap[1],
-        _themes[continous_theme]["color_key_cmap"] if discrete_continous_div_color_key_cmap is None else
+        continous_d["cmap"] if discrete_continous_div_cmap is None else discrete_continous_div_cmap[1],
+        continous_d["color_key_cmap"] if discrete_continous_div_color_key_cmap is None else
         discrete_continous_div_color_key_cmap[1],
-        _themes[continous_theme]["background"],
+        continous_d["background"],
     )
     divergent_cmap, divergent_color_key_cmap, divergent_background = (
-        _themes[divergent_theme]["cmap"] if discrete_continous_div_cmap is None else discrete_continous_div_cmap[2],
-        _themes[divergent_theme]["color_key_cmap"] if discrete_continous_div_color_key_cmap is None else
+        divergent_d["cmap"] if discrete_continous_div_cmap is None else discrete_continous_div_cmap[2],
+        divergent_d["color_key_cmap"] if discrete_continous_div_color_key_cmap is None else
         discrete_continous_div_color_key_cmap[2],
-        _themes[divergent_theme]["background"],
+        divergent_d["background"],
     )
 
     font_color = _select_font_color(discrete_background)
+    discrete_cmap, continous_cmap, divergent_cmap = [
+        plt.get_cmap(c) if isinstance(c, str) else c for c in (discrete_cmap, continous_cmap, divergent_cmap)
+    ]
 
     # the following code is inspired by https://github.com/velocyto-team/velocyto-notebooks/blob/master/python/DentateGyrus.ipynb
     gs = plt.GridSpec(nrow, ncol, wspace=0.5, hspace=0.36)
@@ -551,18 +512,17 @@ def phase_portraits(
                 plt.subplot(gs[i * 3 + 4]),
                 plt.subplot(gs[i * 3 + 5]),
             )
-        try:
-            ix = np.where(adata.var.index == gn)[0][0]
-        except:
-            continue
-        cur_pd = df.loc[df.gene == gn, :]
-        if cur_pd.color.isna().all():
-            if cur_pd.shape[0] <= figsize[0] * figsize[1] * 1000000:
+        # each entry is the gene's column of the (n_cells, n_genes) arrays, no scan over a long-format frame needed
+        cur = {k: v[:, i] for k, v in data.items()}
+        # one (n_cells, 2) phase plane array per gene, shared by the scatter and the quiver of the first panel
+        X_array = np.column_stack((cur[x_key], cur[y_key]))
+        if not has_color:
+            if n_cells <= figsize[0] * figsize[1] * 1000000:
                 ax1, color = _matplotlib_points(
-                    cur_pd.loc[:, ['S', 'U']].values if vkey == 'velocity_S' else cur_pd.loc[:, ['total', 'new']].values,
+                    X_array,
                     ax=ax1,
                     labels=None,
-                    values=cur_pd.loc[:, "expression"].values,
+                    values=cur["expression"],
                     highlights=highlights,
                     cmap=continous_cmap,
                     color_key=discrete_continous_div_color_key[1],
@@ -575,10 +535,10 @@ def phase_portraits(
                 )
             else:
                 ax1, color = _datashade_points(
-                    cur_pd.loc[:, ['S', 'U']].values if vkey == 'velocity_S' else cur_pd.loc[:, ['total', 'new']].values,
+                    X_array,
                     ax=ax1,
                     labels=None,
-                    values=cur_pd.loc[:, "expression"].values,
+                    values=cur["expression"],
                     highlights=highlights,
                     cmap=continous_cmap,
                     color_key=discrete_continous_div_color_key[1],
@@ -590,11 +550,11 @@ def phase_portraits(
                     **scatter_kwargs
                 )
         else:
-            if cur_pd.shape[0] <= figsize[0] * figsize[1] * 1000000:
+            if n_cells <= figsize[0] * figsize[1] * 1000000:
                 ax1, color = _matplotlib_points(
-                    cur_pd.loc[:, ['S', 'U']].values if vkey == 'velocity_S' else cur_pd.loc[:, ['total', 'new']].values,
+                    X_array,
                     ax=ax1,
-                    labels=cur_pd.loc[:, "color"],
+                    labels=color_vec,
                     values=None,
                     highlights=highlights,
                     cmap=discrete_cmap,
@@ -608,9 +568,9 @@ def phase_portraits(
                 )
             else:
                 ax1, color = _datashade_points(
-                    cur_pd.loc[:, ['S', 'U']].values if vkey == 'velocity_S' else cur_pd.loc[:, ['total', 'new']].values,
+                    X_array,
                     ax=ax1,
-                    labels=cur_pd.loc[:, "color"],
+                    labels=color_vec,
                     values=None,
                     highlights=highlights,
                     cmap=discrete_cmap,
@@ -633,20 +593,15 @@ def phase_portraits(
 
         # only linear regression fitting of extreme cells will be plotted together with U-S phase plane.
         if vkey == "velocity_S":
-            xnew = np.linspace(cur_pd.loc[:, 'S'].min(), cur_pd.loc[:, 'S'].max() * 0.80) if vkey == 'velocity_S' else \
-                np.linspace(cur_pd.loc[:, 'total'].min(), cur_pd.loc[:, 'total'].max() * 0.80)
+            xnew = np.linspace(x_min[i], x_max[i] * 0.80)
             ax1.plot(
                 xnew,
-                xnew * cur_pd.loc[:, "gamma"].unique()
-                + cur_pd.loc[:, "velocity_offset"].unique(),
+                xnew * gamma[i] + velocity_offset[i],
                 dashes=[6, 2],
                 c=font_color,
             )
 
-        X_array, V_array = (
-            cur_pd.loc[:, ['S', 'U']].values if vkey == 'velocity_S' else cur_pd.loc[:, ['total', 'new']].values,
-            cur_pd.loc[:, ["vel_s", "vel_u"]].values
-        )
+        V_array = np.column_stack((cur["vel_s"], cur["vel_u"]))
         if no_vel_u and vkey == 'velocity_S': V_array[:, 1] = 0
         # add quiver:
         if show_quiver:
@@ -691,13 +646,12 @@ def phase_portraits(
                 **quiver_kwargs
             )
 
-        ax1.set_xlim(np.min(X_array[:, 0]), np.max(X_array[:, 0]) * 1.02)
-        ax1.set_ylim(np.min(X_array[:, 0]), np.max(X_array[:, 1]) * 1.02)
+        ax1.set_xlim(x_min[i], x_max[i] * 1.02)
+        ax1.set_ylim(x_min[i], y_max[i] * 1.02)
 
         despline(ax1)  # sns.despline()
 
-        df_embedding = pd.concat([cur_pd, embedding], axis=1)
-        V_vec = cur_pd.loc[:, "velocity"]
+        cur_v = cur["velocity"]
 
         # limit = np.nanmax(
         #     np.abs(np.nanpercentile(V_vec, [1, 99]))
@@ -711,12 +665,12 @@ def phase_portraits(
         else:
             show_arrowed_spines_ = show_arrowed_spines
 
-        if cur_pd.shape[0] <= figsize[0] * figsize[1] * 1000000:
+        if n_cells <= figsize[0] * figsize[1] * 1000000:
             ax2, _ = _matplotlib_points(
-                embedding.iloc[:, :2].values,
+                embedding_xy,
                 ax=ax2,
                 labels=None,
-                values=cur_pd.loc[:, "expression"].values,
+                values=cur["expression"],
                 highlights=highlights,
                 cmap=continous_cmap,
                 color_key=discrete_continous_div_color_key[1],
@@ -729,10 +683,10 @@ def phase_portraits(
             )
         else:
             ax2, _ = _datashade_points(
-                embedding.iloc[:, :2].values,
+                embedding_xy,
                 ax=ax2,
                 labels=None,
-                values=cur_pd.loc[:, "expression"].values,
+                values=cur["expression"],
                 highlights=highlights,
                 cmap=continous_cmap,
                 color_key=discrete_continous_div_color_key[1],
@@ -751,15 +705,15 @@ def phase_portraits(
             despline_all(ax2)
             deaxis_all(ax2)
 
-        v_max = 0.01 if min(V_vec) + max(V_vec) == 0 else np.max(np.abs(V_vec.values))
+        v_max = v_max_all[i]
         div_scatter_kwargs.update({"vmin": -v_max, "vmax": v_max})
 
-        if cur_pd.shape[0] <= figsize[0] * figsize[1] * 1000000:
+        if n_cells <= figsize[0] * figsize[1] * 1000000:
             ax3, _ = _matplotlib_points(
-                embedding.iloc[:, :2].values,
+                embedding_xy,
                 ax=ax3,
                 labels=None,
-                values=V_vec.values,
+                values=cur_v,
                 highlights=highlights,
                 cmap=divergent_cmap,
                 color_key=discrete_continous_div_color_key[2],
@@ -774,10 +728,10 @@ def phase_portraits(
             )
         else:
             ax3, _ = _datashade_points(
-                embedding.iloc[:, :2].values,
+                embedding_xy,
                 ax=ax3,
                 labels=None,
-                values=V_vec.values,
+                values=cur_v,
                 highlights=highlights,
                 cmap=divergent_cmap,
                 color_key=discrete_continous_div_color_key[2],
@@ -803,13 +757,14 @@ def phase_portraits(
                 and mode == "full"
                 and all([i in adata.layers.keys() for i in ["uu", "ul", "su", "sl"]])
         ):
-            if cur_pd.color.unique() != np.nan:
-                if cur_pd.shape[0] <= figsize[0] * figsize[1] * 1000000:
+            X_array = np.column_stack((cur["P"], cur["S"]))
+            if not has_color:
+                if n_cells <= figsize[0] * figsize[1] * 1000000:
                     ax4, color = _matplotlib_points(
-                        cur_pd.loc[:, ['P', 'S']].values,
+                        X_array,
                         ax=ax4,
                         labels=None,
-                        values=cur_pd.loc[:, "expression"].values,
+                        values=cur["expression"],
                         highlights=highlights,
                         cmap=continous_cmap,
                         color_key=discrete_continous_div_color_key[1],
@@ -822,10 +777,10 @@ def phase_portraits(
                     )
                 else:
                     ax4, color = _datashade_points(
-                        cur_pd.loc[:, ['P', 'S']].values,
+                        X_array,
                         ax=ax4,
                         labels=None,
-                        values=cur_pd.loc[:, "expression"].values,
+                        values=cur["expression"],
                         highlights=highlights,
                         cmap=continous_cmap,
                         color_key=discrete_continous_div_color_key[1],
@@ -837,11 +792,11 @@ def phase_portraits(
                         **scatter_kwargs
                     )
             else:
-                if cur_pd.shape[0] <= figsize[0] * figsize[1] * 1000000:
+                if n_cells <= figsize[0] * figsize[1] * 1000000:
                     ax4, color = _matplotlib_points(
-                        cur_pd.loc[:, ['P', 'S']].values,
+                        X_array,
                         ax=ax4,
-                        labels=cur_pd.loc[:, "color"].values,
+                        labels=color_vec,
                         values=None,
                         highlights=highlights,
                         cmap=discrete_cmap,
@@ -855,9 +810,9 @@ def phase_portraits(
                     )
                 else:
                     ax4, color = _datashade_points(
-                        cur_pd.loc[:, ['P', 'S']].values,
+                        X_array,
                         ax=ax4,
-                        labels=cur_pd.loc[:, "color"].values,
+                        labels=color_vec,
                         values=None,
                         highlights=highlights,
                         cmap=discrete_cmap,
@@ -874,18 +829,14 @@ def phase_portraits(
             ax4.set_xlabel("spliced (1st moment)")
             ax4.set_ylabel("protein (1st moment)")
 
-            xnew = np.linspace(cur_pd.loc[:, 'P'].min(), cur_pd.loc[:, 'P'].max())
+            xnew = np.linspace(p_min[i], p_max[i])
             ax4.plot(
                 xnew,
-                xnew * cur_pd.loc[:, "gamma_P"].unique()
-                + cur_pd.loc[:, "velocity_offset_P"].unique(),
+                xnew * gamma_P[i] + velocity_offset_P[i],
                 dashes=[6, 2],
                 c=font_color,
             )
-            X_array, V_array = (
-                cur_pd.loc[:, ['P', 'S']].values,
-                cur_pd.loc[:, ["vel_p", "vel_s"]].values,
-            )
+            V_array = np.column_stack((cur["vel_p"], cur["vel_s"]))
 
             # add quiver:
             if show_quiver:
@@ -930,27 +881,19 @@ def phase_portraits(
                     **quiver_kwargs
                 )
 
-            ax4.set_ylim(np.min(X_array[:, 0]), np.max(X_array[:, 0]) * 1.02)
-            ax4.set_xlim(np.min(X_array[:, 1]), np.max(X_array[:, 1]) * 1.02)
+            ax4.set_ylim(p_min[i], p_max[i] * 1.02)
+            ax4.set_xlim(s_min[i], s_max[i] * 1.02)
 
             despline(ax1)  # sns.despline()
 
-            V_vec = df_embedding.loc[:, "velocity_p"]
-
-            limit = np.nanmax(
-                np.abs(np.nanpercentile(V_vec, [1, 99]))
-            )  # upper and lowe limit / saturation
+            cur_vp = P_norm[:, i]
 
-            V_vec = V_vec + limit  # that is: tmp_colorandum - (-limit)
-            V_vec = V_vec / (2 * limit)  # that is: tmp_colorandum / (limit - (-limit))
-            V_vec = np.clip(V_vec, 0, 1)
-
-            if cur_pd.shape[0] <= figsize[0] * figsize[1] * 1000000:
+            if n_cells <= figsize[0] * figsize[1] * 1000000:
                 ax5, _ = _matplotlib_points(
-                    embedding.iloc[:, :2],
+                    embedding_xy,
                     ax=ax5,
                     labels=None,
-                    values=embedding.loc[:, "P"].values,
+                    values=cur["P"],
                     highlights=highlights,
                     cmap=continous_cmap,
                     color_key=discrete_continous_div_color_key[1],
@@ -963,10 +906,10 @@ def phase_portraits(
                 )
             else:
                 ax5, _ = _datashade_points(
-                    embedding.iloc[:, :2],
+                    embedding_xy,
                     ax=ax5,
                     labels=None,
-                    values=embedding.loc[:, "P"].values,
+                    values=cur["P"],
                     highlights=highlights,
                     cmap=continous_cmap,
                     color_key=discrete_continous_div_color_key[1],
@@ -985,15 +928,15 @@ def phase_portraits(
                 despline_all(ax5)
                 deaxis_all(ax5)
 
-            v_max = np.max(np.abs(V_vec.values))
+            v_max = np.max(np.abs(cur_vp))
             div_scatter_kwargs.update({"vmin": -v_max, "vmax": v_max})
 
-            if cur_pd.shape[0] <= figsize[0] * figsize[1] * 1000000:
+            if n_cells <= figsize[0] * figsize[1] * 1000000:
                 ax6, _ = _matplotlib_points(
-                    embedding.iloc[:, :2],
+                    embedding_xy,
                     ax=ax6,
                     labels=None,
-                    values=V_vec.values,
+                    values=cur_vp,
                     highlights=highlights,
                     cmap=divergent_cmap,
                     color_key=discrete_continous_div_color_key[2],
@@ -1008,10 +951,10 @@ def phase_portraits(
                 )
             else:
                 ax6, _ = _datashade_points(
-                    embedding.iloc[:, :2],
+                    embedding_xy,
                     ax=ax6,
                     labels=None,
-                    values=V_vec.values,
+                    values=cur_vp,
                     highlights=highlights,
                     cmap=divergent_cmap,
                     color_key=discrete_continous_div_color_key[2],
@@ -2483,11 +2426,12 @@ def dynamics_(
     import matplotlib.pyplot as plt
 
     genes = list(set(gene_names).intersection(adata.var.index))
+    has_gene = (
+        pd.Index(genes).isin(adata.var["Gene"]) if "Gene" in adata.var.columns else np.zeros(len(genes), dtype=bool)
+    )
     for i, gn in enumerate(genes):
         ax = plt.subplot(gs[i * 3])
-        try:
-            ix = np.where(adata.var["Gene"] == gn)[0][0]
-        except:
+        if not has_gene[i]:
             continue
 
         scatters(
@@ -1,13 +1,61 @@
 import numpy as np
 import pandas as pd
 from scipy.sparse import issparse, csr_matrix
+from numba import njit, prange
 
 from ..preprocessing.preprocess import topTable
 from ..preprocessing.utils import get_layer_keys
-from .utils import save_fig
+from .utils import save_fig, _csr_cols_to_dense
 from ..tools.utils import update_dict, get_mapper
 from ..preprocessing.utils import detect_datatype
 
+
+@njit(parallel=True, nogil=True, fastmath=True, cache=True)
+def _csr_rowsum(indptr, data, out):
+    """Sum the nonzero entries of each row of a CSR matrix into `out`, in parallel over rows."""
+    for i in prange(out.size):
+        s = 0.0
+        for j in range(indptr[i], indptr[i + 1]):
+            s += data[j]
+        out[i] = s
+
+
+def _row_sums(*mats, sp=None):
+    """Compute the per-cell (row) sums of one or more layers with a single pass over the data of each layer.
+
+    CSR layers are reduced by `_csr_rowsum` directly on their `indptr` and nonzero `.data`, which releases the GIL
+    and runs across cells in parallel; other layers are summed in their own format. Layers of one AnnData share a
+    storage type, so sparsity is taken from `sp` or, when it is not given, checked once on the first layer.
+    """
+    sums = []
+    if sp is None:
+        sp = issparse(mats[0])
+    for mat in mats:
+        if sp and mat.format == "csr":
+            out = np.empty(mat.shape[0], dtype=np.float64)
+            _csr_rowsum(mat.indptr, mat.data, out)
+            sums.append(out)
+        else:
+            sums.append(np.asarray(mat.sum(axis=1)).ravel())
+
+    return sums
+
+
+@njit(parallel=True, nogil=True, cache=True, error_model="numpy")
+def _fractions(sums):
+    """Normalize the per-cell sums of each category (rows of `sums`) by the per-cell total in one pass over cells."""
+    n_cat, n_cell = sums.shape
+    out = np.empty((n_cat, n_cell), dtype=np.float64)
+    for i in prange(n_cell):
+        tot = 0.0
+        for j in range(n_cat):
+            tot += sums[j, i]
+        for j in range(n_cat):
+            out[j, i] = sums[j, i] / tot
+
+    return out
+
+
 def basic_stats(adata,
                   group=None,
                   figsize=(4, 3),
@@ -152,18 +200,16 @@ def show_fraction(adata,
             "your data doesn't seem to have either splicing or labeling or both information"
         )
 
+    # slice the genes once, every layer below is read from the same view
+    layers = adata.layers if genes is None else adata[:, genes].layers
+    sp = issparse(adata.layers[{"labelling": "new", "splicing": "unspliced", "full": "uu"}[mode]])
+
     if mode == "labelling":
-        new_mat, total_mat = (adata.layers["new"], adata.layers["total"]) if genes is None else \
-            (adata[:, genes].layers["new"], adata[:, genes].layers["total"])
+        new_mat, total_mat = layers["new"], layers["total"]
 
-        new_cell_sum, tot_cell_sum = (
-            (np.sum(new_mat, 1), np.sum(total_mat, 1))
-            if not issparse(new_mat)
-            else (new_mat.sum(1).A1, total_mat.sum(1).A1)
-        )
+        new_cell_sum, tot_cell_sum = _row_sums(new_mat, total_mat, sp=sp)
 
-        new_frac_cell = new_cell_sum / tot_cell_sum
-        old_frac_cell = 1 - new_frac_cell
+        new_frac_cell, old_frac_cell = _fractions(np.vstack((new_cell_sum, tot_cell_sum - new_cell_sum)))
         df = pd.DataFrame(
             {"new_frac_cell": new_frac_cell, "old_frac_cell": old_frac_cell},
             index=adata.obs.index,
@@ -179,37 +225,20 @@ def show_fraction(adata,
 
     elif mode == "splicing":
         if "ambiguous" in adata.layers.keys():
-            ambiguous = adata.layers["ambiguous"] if genes is None else adata[:, genes].layers["ambiguous"]
+            ambiguous = layers["ambiguous"]
         else:
-            ambiguous = (
-                csr_matrix(np.array([[0]]))
-                if issparse(adata.layers["unspliced"])
-                else np.array([[0]])
-            )
+            ambiguous = csr_matrix(np.array([[0]])) if sp else np.array([[0]])
 
         unspliced_mat, spliced_mat, ambiguous_mat = (
-            adata.layers["unspliced"] if genes is None else adata[:, genes].layers["unspliced"],
-            adata.layers["spliced"] if genes is None else adata[:, genes].layers["spliced"],
+            layers["unspliced"],
+            layers["spliced"],
             ambiguous,
         )
-        un_cell_sum, sp_cell_sum = (
-            (np.sum(unspliced_mat, 1), np.sum(spliced_mat, 1))
-            if not issparse(unspliced_mat)
-            else (unspliced_mat.sum(1).A1, spliced_mat.sum(1).A1)
-        )
+        un_cell_sum, sp_cell_sum = _row_sums(unspliced_mat, spliced_mat, sp=sp)
 
         if "ambiguous" in adata.layers.keys():
-            am_cell_sum = (
-                ambiguous_mat.sum(1).A1
-                if issparse(unspliced_mat)
-                else np.sum(ambiguous_mat, 1)
-            )
-            tot_cell_sum = un_cell_sum + sp_cell_sum + am_cell_sum
-            un_frac_cell, sp_frac_cell, am_frac_cell = (
-                un_cell_sum / tot_cell_sum,
-                sp_cell_sum / tot_cell_sum,
-                am_cell_sum / tot_cell_sum,
-            )
+            am_cell_sum = _row_sums(ambiguous_mat, sp=sp)[0]
+            un_frac_cell, sp_frac_cell, am_frac_cell = _fractions(np.vstack((un_cell_sum, sp_cell_sum, am_cell_sum)))
             df = pd.DataFrame(
                 {
                     "unspliced": un_frac_cell,
@@ -219,11 +248,7 @@ def show_fraction(adata,
                 index=adata.obs.index,
             )
         else:
-            tot_cell_sum = un_cell_sum + sp_cell_sum
-            un_frac_cell, sp_frac_cell = (
-                un_cell_sum / tot_cell_sum,
-                sp_cell_sum / tot_cell_sum,
-            )
+            un_frac_cell, sp_frac_cell = _fractions(np.vstack((un_cell_sum, sp_cell_sum)))
             df = pd.DataFrame(
                 {"unspliced": un_frac_cell, "spliced": sp_frac_cell},
                 index=adata.obs.index,
@@ -246,31 +271,10 @@ def show_fraction(adata,
             )
 
     elif mode == "full":
-        uu, ul, su, sl = (
-            adata.layers["uu"] if genes is None else adata[:, genes].layers["uu"],
-            adata.layers["ul"] if genes is None else adata[:, genes].layers["ul"],
-            adata.layers["su"] if genes is None else adata[:, genes].layers["su"],
-            adata.layers["sl"] if genes is None else adata[:, genes].layers["sl"],
-        )
-        uu_sum, ul_sum, su_sum, sl_sum = (
-            np.sum(uu, 1),
-            np.sum(ul, 1),
-            np.sum(su, 1),
-            np.sum(sl, 1)
-        ) if not issparse(uu) else (
-            uu.sum(1).A1,
-            ul.sum(1).A1,
-            su.sum(1).A1,
-            sl.sum(1).A1,
-        )
+        uu, ul, su, sl = layers["uu"], layers["ul"], layers["su"], layers["sl"]
+        uu_sum, ul_sum, su_sum, sl_sum = _row_sums(uu, ul, su, sl, sp=sp)
 
-        tot_cell_sum = uu_sum + ul_sum + su_sum + sl_sum
-        uu_frac, ul_frac, su_frac, sl_frac = (
-            uu_sum / tot_cell_sum,
-            ul_sum / tot_cell_sum,
-            su_sum / tot_cell_sum,
-            sl_sum / tot_cell_sum,
-        )
+        uu_frac, ul_frac, su_frac, sl_frac = _fractions(np.vstack((uu_sum, ul_sum, su_sum, sl_sum)))
         df = pd.DataFrame(
             {
                 "uu_frac": uu_frac,
@@ -365,8 +369,9 @@ def variance_explained(adata,
     var_ = adata.uns["explained_variance_ratio_"]
     _, ax = plt.subplots(figsize=figsize)
     ax.plot(var_, c="r")
-    tmp = np.diff(np.diff(np.cumsum(var_)) > threshold)
-    n_comps = n_pcs if n_pcs is not None else np.where(tmp)[0][0] if np.any(tmp) else 20
+    # np.diff(np.cumsum(var_)) is just var_[1:]; argmax returns the first PC where it crosses the threshold
+    tmp = np.diff(var_[1:] > threshold)
+    n_comps = n_pcs if n_pcs is not None else int(tmp.argmax()) if tmp.any() else 20
     ax.axvline(n_comps, c="r")
     ax.set_xlabel("PCs")
     ax.set_ylabel("Variance explained")
@@ -615,25 +620,26 @@ def exp_by_groups(adata,
     if layer != 'X' and layer not in adata.layers.keys():
         raise ValueError(f"The layer {layer} is not existed in your adata object!")
 
-    exprs = adata[:, valid_genes].X if layer == 'X' else adata[:, valid_genes].layers[layer]
-    exprs = exprs.A if issparse(exprs) else exprs
+    # only the columns of the selected genes are densified, never the full layer
+    gene_idx = adata.var_names.get_indexer(valid_genes)
+    exprs = _csr_cols_to_dense(adata.X if layer == 'X' else adata.layers[layer], gene_idx)
     if use_ratio:
         has_splicing, has_labeling, splicing_labeling, has_protein = detect_datatype(adata)
         if has_labeling:
             if layer.startswith('X_') or layer.startswith('M_'):
-                tot = adata[:, valid_genes].layers[mapper['X_total']] if use_smoothed \
-                    else adata[:, valid_genes].layers['X_total']
-                tot = tot.A if issparse(tot) else tot
+                tot = _csr_cols_to_dense(
+                    adata.layers[mapper['X_total']] if use_smoothed else adata.layers['X_total'], gene_idx
+                )
                 exprs = exprs / tot
             else:
                 exprs = exprs
         else:
             if layer.startswith('X_') or layer.startswith('M_'):
-                tot = adata[:, valid_genes].layers[mapper['X_unspliced']] + \
-                        adata[:, valid_genes].layers[mapper['X_spliced']] if use_smoothed \
-                    else adata[:, valid_genes].layers['X_unspliced'] + \
-                         adata[:, valid_genes].layers['X_spliced']
-                tot = tot.A if issparse(tot) else tot
+                tot = _csr_cols_to_dense(
+                    adata.layers[mapper['X_unspliced']] if use_smoothed else adata.layers['X_unspliced'], gene_idx
+                ) + _csr_cols_to_dense(
+                    adata.layers[mapper['X_spliced']] if use_smoothed else adata.layers['X_spliced'], gene_idx
+                )
                 exprs = exprs / tot
             else:
                 exprs = exprs
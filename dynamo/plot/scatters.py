@@ -9,6 +9,9 @@ from numbers import Number
 
 import matplotlib.colors
 import matplotlib.cm
+import matplotlib.pyplot as plt
+from matplotlib import rcParams
+from matplotlib.colors import to_hex
 
 from ..configuration import _themes, set_figure_params, reset_rcParams
 from .utils import (
@@ -253,10 +256,6 @@ def scatters(
             then this will simply display inline.
     """
 
-    import matplotlib.pyplot as plt
-    from matplotlib import rcParams
-    from matplotlib.colors import to_hex
-
     if contour: frontier = False
 
     if background is None:
@@ -419,7 +418,8 @@ def scatters(
                         points.columns = [cur_x + " (" + cur_l_smoothed + ")", cur_y]
                         cur_title = cur_x
                     elif is_layer_keys(adata, cur_x) and is_layer_keys(adata, cur_y):
-                        cur_x_, cur_y_ = adata[:, cur_b].layers[cur_x], adata[:, cur_b].layers[cur_y]
+                        layers_b = adata[:, cur_b].layers  # one view for both layers
+                        cur_x_, cur_y_ = layers_b[cur_x], layers_b[cur_y]
                         points = pd.DataFrame(
                             {cur_x: flatten(cur_x_),
                              cur_y: flatten(cur_y_)}
@@ -443,35 +443,22 @@ def scatters(
                             adata.obs[aggregate],
                             adata.obs[aggregate].unique().to_list(),
                         )
-                        group_color, group_median = (
-                            np.zeros((1, len(uniq_grp))).flatten()
+                        grp_keys = np.asarray(groups)
+                        group_median = points.iloc[:, :2].groupby(grp_keys, sort=False).median().reindex(uniq_grp).values
+                        color_grouped = pd.Series(np.asarray(_color)).groupby(grp_keys, sort=False)
+                        group_color = np.asarray((
+                            color_grouped.median()
                             if isinstance(_color[0], Number)
-                            else np.zeros((1, len(uniq_grp))).astype("str").flatten(),
-                            np.zeros((len(uniq_grp), 2)),
-                        )
+                            else color_grouped.agg(lambda x: x.value_counts().index[0]).astype("str")
+                        ).reindex(uniq_grp))
 
-                        grp_size = adata.obs[aggregate].value_counts().values
+                        grp_size = color_grouped.size().reindex(uniq_grp).values
                         scatter_kwargs = (
                             {"s": grp_size}
                             if scatter_kwargs is None
                             else update_dict(scatter_kwargs, {"s": grp_size})
                         )
 
-                        for ind, cur_grp in enumerate(uniq_grp):
-                            group_median[ind, :] = np.nanmedian(
-                                points.iloc[np.where(groups == cur_grp)[0], :2], 0
-                            )
-                            if isinstance(_color[0], Number):
-                                group_color[ind] = np.nanmedian(
-                                    np.array(_color)[np.where(groups == cur_grp)[0]]
-                                )
-                            else:
-                                group_color[ind] = (
-                                    pd.Series(_color)[np.where(groups == cur_grp)[0]]
-                                    .value_counts()
-                                    .index[0]
-                                )
-
                         points, _color = (
                             pd.DataFrame(
                                 group_median, index=uniq_grp, columns=points.columns
@@ -509,14 +496,15 @@ def scatters(
                         else:
                             _theme_ = theme
 
-                    _cmap = _themes[_theme_]["cmap"] if cmap is None else cmap
+                    theme_d = _themes[_theme_]
+                    _cmap = theme_d["cmap"] if cmap is None else cmap
                     _color_key_cmap = (
-                        _themes[_theme_]["color_key_cmap"]
+                        theme_d["color_key_cmap"]
                         if color_key_cmap is None
                         else color_key_cmap
                     )
                     _background = (
-                        _themes[_theme_]["background"] if _background is None else _background
+                        theme_d["background"] if _background is None else _background
                     )
 
                     if labels is not None and values is not None:
@@ -534,13 +522,13 @@ def scatters(
                             _highlights = highlights[color.index(cur_c)]
                             _highlights = (
                                 _highlights
-                                if all([i in _color for i in _highlights])
+                                if set(_highlights).issubset(_color)
                                 else None
                             )
                         else:
                             _highlights = (
                                 highlights
-                                if all([i in _color for i in highlights])
+                                if set(highlights).issubset(_color)
                                 else None
                             )
 
@@ -619,10 +607,10 @@ def scatters(
                                     or all(adata.var.gamma_b.isna())
                             ):
                                 adata.var.loc[:, "gamma_b"] = 0
+                            gamma, gamma_b = adata.var.loc[cur_b, [k_name, "gamma_b"]]
                             ax.plot(
                                 xnew,
-                                xnew * adata[:, cur_b].var.loc[:, k_name].unique()
-                                + adata[:, cur_b].var.loc[:, "gamma_b"].unique(),
+                                xnew * gamma + gamma_b,
                                 dashes=[6, 2],
                                 c=font_color,
                             )
@@ -117,14 +117,18 @@ def kinetic_curves(
         exprs = exprs[valid_ind, :]
         time = time[valid_ind]
 
+    # keep only the requested genes before going long, and store the gene of each row as a categorical code
+    gene_mask = np.isin(valid_genes, genes)
+    valid_genes, exprs = np.asarray(valid_genes)[gene_mask], exprs[:, gene_mask]
     exprs_df = pd.DataFrame(
         {
             "Time": np.repeat(time, len(valid_genes)),
-            "Expression": exprs.flatten(),
-            "Gene": np.tile(valid_genes, len(time)),
+            "Expression": exprs.ravel(),
+            "Gene": pd.Categorical.from_codes(
+                np.tile(np.arange(len(valid_genes)), len(time)), categories=valid_genes
+            ),
         }
     )
-    exprs_df = exprs_df.query("Gene in @genes")
 
     if exprs_df.shape[0] == 0:
         raise Exception(
@@ -2,7 +2,8 @@ import os
 import numpy as np
 import pandas as pd
 import math
-import numba
+import sys
+from functools import lru_cache
 import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib.patches import Patch
@@ -10,6 +11,7 @@ from matplotlib.lines import Line2D
 import matplotlib.patheffects as PathEffects
 import matplotlib.tri as tri
 from scipy.spatial import Delaunay
+from scipy.sparse import issparse
 from warnings import warn
 
 from ..configuration import _themes
@@ -67,39 +69,35 @@ def _to_hex(arr):
     return [matplotlib.colors.to_hex(c) for c in arr]
 
 
-# https://stackoverflow.com/questions/8468855/convert-a-rgb-colour-value-to-decimal
-"""Convert RGB color to decimal RGB integers are typically treated as three distinct bytes where the left-most (highest-order) 
-byte is red, the middle byte is green and the right-most (lowest-order) byte is blue. """
+@lru_cache(maxsize=64)
+def _named_color_key(color_key_cmap, n):
+    lut = plt.get_cmap(color_key_cmap)(np.linspace(0, 1, n))
+    lut.flags.writeable = False  # shared by every caller of the cache
+    return lut
 
 
-@numba.vectorize(["uint8(uint32)", "uint8(uint32)"])
-def _red(x):
-    return (x & 0xFF0000) >> 16
-
-
-@numba.vectorize(["uint8(uint32)", "uint8(uint32)"])
-def _green(x):
-    return (x & 0x00FF00) >> 8
-
-
-@numba.vectorize(["uint8(uint32)", "uint8(uint32)"])
-def _blue(x):
-    return x & 0x0000FF
+def _color_key(color_key_cmap, n):
+    """`n` evenly spaced RGBA colors of a colormap. Lookups by colormap name are cached, so panels sharing a cmap and
+    label count reuse the same table."""
+    if isinstance(color_key_cmap, str):
+        return _named_color_key(color_key_cmap, n)
+    return plt.get_cmap(color_key_cmap)(np.linspace(0, 1, n))
 
 
 def _embed_datashader_in_an_axis(datashader_image, ax):
-    img_rev = datashader_image.data[::-1]
-    mpl_img = np.dstack([_blue(img_rev), _green(img_rev), _red(img_rev)])
+    """Show a datashader image on `ax`. The packed uint32 pixels are viewed as four bytes each and the three color
+    bytes are sliced out directly, which needs no per-channel pass over the image."""
+    raw = np.ascontiguousarray(datashader_image.data)
+    u8 = raw.view(np.uint8).reshape(raw.shape[0], raw.shape[1], 4)[::-1]
+    # the lowest-order byte comes first in memory on little-endian machines and last on big-endian ones
+    mpl_img = u8[..., :3] if sys.byteorder == "little" else u8[..., 3:0:-1]
     ax.imshow(mpl_img)
     return ax
 
 
 def _get_extent(points):
     """Compute bounds on a space with appropriate padding"""
-    min_x = np.min(points[:, 0])
-    max_x = np.max(points[:, 0])
-    min_y = np.min(points[:, 1])
-    max_y = np.max(points[:, 1])
+    (min_x, min_y), (max_x, max_y) = points[:, :2].min(axis=0), points[:, :2].max(axis=0)
 
     extent = (
         np.round(min_x - 0.05 * (max_x - min_x)),
@@ -117,14 +115,9 @@ def _select_font_color(background):
     elif background in ["w", "white"]:
         font_color = "black"
     elif background.startswith("#"):
-        mean_val = np.mean(
-            # specify 0 as the base in order to invoke this prefix-guessing behavior;
-            # omitting it means to assume base-10
-            [
-                int("0x" + c, 0)
-                for c in (background[1:3], background[3:5], background[5:7])
-            ]
-        )
+        # parse #RRGGBB once and pull the three channels out with shifts
+        rgb = int(background[1:7], 16)
+        mean_val = (((rgb >> 16) & 0xFF) + ((rgb >> 8) & 0xFF) + (rgb & 0xFF)) / 3
         if mean_val > 126:
             font_color = "black"
         else:
@@ -136,6 +129,12 @@ def _select_font_color(background):
     return font_color
 
 
+def _csr_cols_to_dense(X, col_idx):
+    """Slice the `col_idx` columns of a (sparse) layer, then densify them into a (n_obs, len(col_idx)) array."""
+    X = X[:, col_idx]
+    return X.toarray() if issparse(X) else np.asarray(X)
+
+
 def _matplotlib_points(
         points,
         ax=None,
@@ -196,20 +195,20 @@ def _matplotlib_points(
             if highlights is None:
                 unique_labels = np.unique(labels)
                 num_labels = unique_labels.shape[0]
-                color_key = plt.get_cmap(color_key_cmap)(np.linspace(0, 1, num_labels))
+                color_key = _color_key(color_key_cmap, num_labels)
             else:
                 if type(highlights) is str: highlights = [highlights]
-                highlights.append("other")
+                highlights = list(highlights) + ["other"]  # don't grow the caller's list on every panel
                 unique_labels = np.array(highlights)
                 num_labels = unique_labels.shape[0]
                 color_key = _to_hex(
-                    plt.get_cmap(color_key_cmap)(np.linspace(0, 1, num_labels))
+                    _color_key(color_key_cmap, num_labels)
                 )
                 color_key[
                     -1
                 ] = "#bdbdbd"  # lightgray hex code https://www.color-hex.com/color/d3d3d3
 
-                labels[[i not in highlights[:-1] for i in labels]] = "other"
+                labels[~np.isin(labels, highlights[:-1])] = "other"
                 points = pd.DataFrame(points)
                 points["label"] = pd.Categorical(labels)
 
@@ -226,32 +225,33 @@ def _matplotlib_points(
                 points = pd.concat((points.loc[background_ids, :], points.loc[highlight_ids, :])).values
                 labels = points[:, 2]
 
+        unique_labels, label_codes = np.unique(labels, return_inverse=True)
+        # the legend handles are only built when a legend box will actually be drawn
+        legend_box = show_legend and (show_legend != "on data" or len(unique_labels) <= 1)
         if isinstance(color_key, dict):
             colors = pd.Series(labels).map(color_key).values
-            unique_labels = np.unique(labels)
             legend_elements = [
                 # Patch(facecolor=color_key[k], label=k) for k in unique_labels
                 Line2D(
                     [0], [0], marker="o", color=color_key[k], label=k, linestyle="None"
                 )
                 for k in unique_labels
-            ]
+            ] if legend_box else []
         else:
-            unique_labels = np.unique(labels)
             if len(color_key) < unique_labels.shape[0]:
                 raise ValueError(
                     "Color key must have enough colors for the number of labels"
                 )
 
-            new_color_key = {k: color_key[i] for i, k in enumerate(unique_labels)}
             legend_elements = [
                 # Patch(facecolor=color_key[i], label=k)
                 Line2D(
                     [0], [0], marker="o", color=color_key[i], label=k, linestyle="None"
                 )
                 for i, k in enumerate(unique_labels)
-            ]
-            colors = pd.Series(labels).map(new_color_key)
+            ] if legend_box else []
+            # the i-th color belongs to the i-th sorted label, so each cell's color is a gather by its label code
+            colors = np.asarray(color_key)[label_codes.ravel()]
 
         if frontier:
             rasterized = kwargs['rasterized'] if 'rasterized' in kwargs.keys() else None
@@ -340,12 +340,12 @@ def _matplotlib_points(
         # if positive and sum up to 1, take fraction
         # if positive and sum up to 100, take percentage
         # otherwise take the data
-        _vmin = np.nanmin(values) if vmin is None else np.nanpercentile(values, vmin * 100) if \
-            (vmin + vmax == 1 and 0 <= vmin < vmax) else np.nanpercentile(values, vmin) \
-            if (vmin + vmax == 100 and 0 <= vmin < vmax) else vmin
-        _vmax = np.nanmax(values) if vmax is None else np.nanpercentile(values, vmax * 100) if \
-            (vmin + vmax == 1 and 0 <= vmin < vmax) else np.nanpercentile(values, vmax) \
-            if (vmin + vmax == 100 and 0 <= vmin < vmax) else vmax
+        if vmin is not None and vmax is not None and vmin + vmax in [1, 100] and 0 <= vmin < vmax:
+            # both bounds are percentiles, select them with a single partition of the values
+            _vmin, _vmax = np.nanpercentile(values, np.array([vmin, vmax]) * (100 if vmin + vmax == 1 else 1))
+        else:
+            _vmin = np.nanmin(values) if vmin is None else vmin
+            _vmax = np.nanmax(values) if vmax is None else vmax
 
         if sym_c and _vmin < 0 and _vmax > 0:
             bounds = np.nanmax([np.abs(_vmin), _vmax])
@@ -441,10 +441,10 @@ def _matplotlib_points(
     if show_legend and legend_elements is not None:
         if len(unique_labels) > 1 and show_legend == "on data":
             font_color = "white" if background in ["black", "#ffffff"] else "black"
-            for i in unique_labels:
+            centers = pd.DataFrame(points[:, :2].astype('float')).groupby(np.asarray(labels), sort=True).median()
+            for i, color_cnt in zip(centers.index, centers.values):
                 if i == 'other':
                     continue
-                color_cnt = np.nanmedian(points[np.where(labels == i)[0], :2].astype('float'), 0)
                 txt = plt.text(
                     color_cnt[0],
                     color_cnt[1],
@@ -487,7 +487,7 @@ def _datashade_points(
         show_legend=True,
         vmin=2,
         vmax=98,
-        sort='raw',
+        sort='raw',  # ignored: values are shaded by the per-pixel mean, which doesn't depend on draw order
         **kwargs,
 ):
     import matplotlib.pyplot as plt
@@ -535,20 +535,20 @@ def _datashade_points(
                 unique_labels = np.unique(labels)
                 num_labels = unique_labels.shape[0]
                 color_key = _to_hex(
-                    plt.get_cmap(color_key_cmap)(np.linspace(0, 1, num_labels))
+                    _color_key(color_key_cmap, num_labels)
                 )
             else:
-                highlights.append("other")
+                highlights = list(highlights) + ["other"]  # don't grow the caller's list on every panel
                 unique_labels = np.array(highlights)
                 num_labels = unique_labels.shape[0]
                 color_key = _to_hex(
-                    plt.get_cmap(color_key_cmap)(np.linspace(0, 1, num_labels))
+                    _color_key(color_key_cmap, num_labels)
                 )
                 color_key[
                     -1
                 ] = "#bdbdbd"  # lightgray hex code https://www.color-hex.com/color/d3d3d3
 
-                labels[[i not in highlights for i in labels]] = "other"
+                labels[~np.isin(labels, highlights)] = "other"
                 data["label"] = pd.Categorical(labels)
 
                 # reorder data so that highlighting points will be on top of background points
@@ -590,34 +590,19 @@ def _datashade_points(
                     values.shape[0], points.shape[0]
                 )
             )
-        # reorder data so that high values data will be on top of background data
-        sorted_id = np.argsort(abs(values)) if sort == 'abs' else np.argsort(values)
-        values, data = values[sorted_id], data.iloc[sorted_id, :]
-
-        values[np.isnan(values)] = 0
-        _vmin = np.min(values) if vmin is None else np.percentile(values, vmin)
-        _vmax = np.min(values) if vmin is None else np.percentile(values, vmax)
-
-        values = np.clip(values, _vmin, _vmax)
-
-        unique_values = np.unique(values)
-        if unique_values.shape[0] >= 256:
-            min_val, max_val = np.min(values), np.max(values)
-            bin_size = (max_val - min_val) / 255.0
-            data["val_cat"] = pd.Categorical(
-                np.round((values - min_val) / bin_size).astype(np.int16)
-            )
-            aggregation = canvas.points(data, "x", "y", agg=ds.count_cat("val_cat"))
-            color_key = _to_hex(plt.get_cmap(cmap)(np.linspace(0, 1, 256)))
-            result = tf.shade(aggregation, color_key=color_key, how="eq_hist")
+        # each pixel is shaded by the mean value of its points, so unlike the matplotlib path no draw order is needed
+        values = np.where(np.isnan(values), 0, values)
+        if vmin is not None and vmax is not None:
+            _vmin, _vmax = np.percentile(values, [vmin, vmax])
         else:
-            data["val_cat"] = pd.Categorical(values)
-            aggregation = canvas.points(data, "x", "y", agg=ds.count_cat("val_cat"))
-            color_key_cols = _to_hex(
-                plt.get_cmap(cmap)(np.linspace(0, 1, unique_values.shape[0]))
-            )
-            color_key = dict(zip(unique_values, color_key_cols))
-            result = tf.shade(aggregation, color_key=color_key, how="eq_hist")
+            _vmin = np.nanmin(values) if vmin is None else np.percentile(values, vmin)
+            _vmax = np.nanmax(values) if vmax is None else np.percentile(values, vmax)
+
+        data["value"] = np.clip(values, _vmin, _vmax)
+        aggregation = canvas.points(data, "x", "y", agg=ds.mean("value"))
+        # a constant value leaves no range to stretch over, widen it so the points are still drawn
+        span = (_vmin, _vmax) if _vmax > _vmin else (_vmin, _vmin + 1)
+        result = tf.shade(aggregation, cmap=plt.get_cmap(cmap), how="linear", span=span)
 
     # Color by density (default datashader option)
     else:
@@ -632,10 +617,8 @@ def _datashade_points(
         if show_legend and legend_elements is not None:
             if len(unique_labels) > 1 and show_legend == "on data":
                 font_color = "white" if background == "black" else "black"
-                for i in unique_labels:
-                    color_cnt = np.nanmedian(
-                        points.iloc[np.where(labels == i)[0], :2], 0
-                    )
+                centers = pd.DataFrame(np.asarray(points)[:, :2]).groupby(labels, sort=True).median()
+                for i, color_cnt in zip(centers.index, centers.values):
                     txt = plt.text(
                         color_cnt[0],
                         color_cnt[1],
@@ -653,7 +636,7 @@ def _datashade_points(
                         ]
                     )
             else:
-                if type(show_legend) == "str":
+                if isinstance(show_legend, str) and show_legend != "on data":
                     ax.legend(
                         handles=legend_elements,
                         loc=show_legend,
@@ -811,7 +794,7 @@ def interactive(
             unique_labels = np.unique(labels)
             num_labels = unique_labels.shape[0]
             color_key = _to_hex(
-                plt.get_cmap(color_key_cmap)(np.linspace(0, 1, num_labels))
+                _color_key(color_key_cmap, num_labels)
             )
 
         if isinstance(color_key, dict):
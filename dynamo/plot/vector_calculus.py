@@ -471,7 +471,7 @@ def jacobian(adata,
     point_size = 4 * point_size
 
     scatter_kwargs = dict(
-        alpha=0.2, s=point_size, edgecolor=None, linewidth=0,
+        alpha=0.2, s=point_size, edgecolor=None, linewidth=0, rasterized=True,
     )  # (0, 0, 0, 1)
     if kwargs is not None:
         scatter_kwargs.update(kwargs)
@@ -880,7 +880,7 @@ def sensitivity(adata,
     point_size = 4 * point_size
 
     scatter_kwargs = dict(
-        alpha=0.2, s=point_size, edgecolor=None, linewidth=0,
+        alpha=0.2, s=point_size, edgecolor=None, linewidth=0, rasterized=True,
     )  # (0, 0, 0, 1)
     if kwargs is not None:
         scatter_kwargs.update(kwargs)